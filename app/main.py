@@ -1,31 +1,104 @@
 from __future__ import annotations
 
-import base64
+import asyncio
 import json
+import multiprocessing
 import os
 import shutil
+import signal
+import stat
 import subprocess
+import time
 import uuid
-import zipfile
+import zlib
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import partial
 from io import BytesIO
 from json import JSONDecodeError
 from tempfile import NamedTemporaryFile, TemporaryDirectory, mkdtemp
-from typing import Iterable
-
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Literal
+from urllib.parse import urlsplit, urlunsplit
+from weakref import WeakValueDictionary
+
+import aiofiles
+import av
+import pybase64
+import pymupdf
+from cachetools import TTLCache
 from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
-from fastapi.responses import JSONResponse, StreamingResponse
-from pdf2image import convert_from_path
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from PIL import Image
 from playwright.async_api import (
+    Browser,
     Error as PlaywrightError,
+    Route,
     TimeoutError as PlaywrightTimeoutError,
     async_playwright,
 )
+from starlette.background import BackgroundTask
+from stream_zip import NO_COMPRESSION_64, ZIP_64, MemberFile, stream_zip
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # One Chromium process serves every screenshot; requests only pay for a
+    # fresh BrowserContext. It is launched on first use (see _get_browser) so a
+    # missing or crashed browser only affects /screenshot. unoserver likewise
+    # keeps LibreOffice resident, and the renderer pool is started before the
+    # first request needs it. The pool workers are forked first, while this is
+    # still a single-threaded process with no driver pipes to inherit.
+    _warm_up()
+    playwright = await async_playwright().start()
+    app.state.playwright = playwright
+    app.state.unoserver = _start_unoserver()
+    app.state.browser = None
+    app.state.browser_lock = asyncio.Lock()
+    try:
+        try:
+            yield
+        finally:
+            if app.state.browser is not None:
+                await app.state.browser.close()
+    finally:
+        _clear_jpeg_store()
+        if app.state.unoserver is not None:
+            _stop_unoserver(app.state.unoserver, grace=UNOSERVER_STOP_TIMEOUT)
+        await playwright.stop()
 
-app = FastAPI(title="PDF to JPEG service")
+
+app = FastAPI(title="PDF to JPEG service", lifespan=lifespan)
 
 BOUNDARY_PREFIX = "pdf-image-boundary"
+MULTIPART_PART_HEADER = (
+    b"--%s\r\n"
+    b"Content-Type: image/jpeg\r\n"
+    b'Content-Disposition: attachment; filename="page-%d.jpg"\r\n'
+    b"Content-Length: %d\r\n\r\n"
+)
 CHUNK_SIZE = 1024 * 1024
+# Multiple of 3 so base64 padding only ever appears after the final chunk.
+JSON_CHUNK_SIZE = 192 * 1024
 ZIP_FILENAME = "pages.zip"
+# Same defaults pdf2image/pdftoppm used: 200 DPI and libjpeg quality 75.
+DEFAULT_RENDER_DPI = 200
+DEFAULT_JPEG_QUALITY = 75
+DEFAULT_VIDEO_FRAME_QUALITY = 90
+# VideoFrame.rotation is the counterclockwise display rotation, as is PIL's.
+VIDEO_ROTATION_TRANSPOSE = {
+    90: Image.Transpose.ROTATE_90,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_270,
+}
+# Seconds a single office conversion may take before LibreOffice is given up on.
+OFFICE_CONVERT_TIMEOUT = 180
+# Seconds unoserver gets to exit cleanly on shutdown before it is killed.
+UNOSERVER_STOP_TIMEOUT = 10
+# Encoded pages held in memory per request before further pages spill to disk.
+PAGE_SPILL_SIZE = 256 * 1024 * 1024
 
 PDF_EXTENSIONS = {".pdf"}
 DOCUMENT_EXTENSIONS = {".doc", ".docx"}
@@ -33,6 +106,15 @@ SPREADSHEET_EXTENSIONS = {".xls", ".xlsx"}
 PRESENTATION_EXTENSIONS = {".ppt", ".pptx"}
 VIDEO_EXTENSIONS = {".mp4", ".mov", ".avi"}
 
+FAST_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media"})
+
+ZIP_RESPONSE_FORMATS = frozenset({"zip", "zip-deflate"})
+ACCEPT_RESPONSE_FORMATS = {
+    "application/zip": "zip",
+    "application/x-zip-compressed": "zip",
+    "application/json": "json",
+}
+
 SUPPORTED_EXTENSIONS = (
     PDF_EXTENSIONS
     | DOCUMENT_EXTENSIONS
@@ -41,6 +123,29 @@ SUPPORTED_EXTENSIONS = (
     | VIDEO_EXTENSIONS
 )
 
+# Recent screenshots keyed by (normalized URL, fast mode), bounded by total
+# JPEG bytes. The per-key locks coalesce concurrent renders of the same page.
+_SCREENSHOT_CACHE: TTLCache[tuple[str, bool], bytes] = TTLCache(
+    maxsize=64 * 1024 * 1024, ttl=60, getsizeof=len
+)
+_SCREENSHOT_LOCKS: WeakValueDictionary[tuple[str, bool], asyncio.Lock] = WeakValueDictionary()
+
+# Pages published through response_format=urls, served by GET /jpeg/{page_id}.
+# Each publish is one batch directory; batches share one TTL, so insertion
+# order is also expiry order. /tmp is memory-backed on Cloud Run, so the total
+# is capped and the oldest batches are evicted first.
+JPEG_URL_TTL = 300
+JPEG_STORE_MAX_BYTES = 256 * 1024 * 1024
+_JPEG_STORE: dict[str, str] = {}
+_JPEG_BATCHES: dict[str, tuple[float, int, list[str]]] = {}
+
+# Pages are rasterised in separate processes: rendering is CPU-bound and
+# MuPDF contexts must not be shared between threads. Workers come from a
+# forkserver that _warm_up starts while the process is still single-threaded,
+# so neither this pool nor a replacement inherits Playwright's driver pipes.
+_POOL_CONTEXT = multiprocessing.get_context("forkserver")
+_POOL = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=_POOL_CONTEXT)
+
 
 def _get_upload_suffix(upload: UploadFile) -> str:
     if upload.filename:
@@ -75,49 +180,125 @@ def _categorize_extension(suffix: str) -> str:
     return "unknown"
 
 
-def _convert_office_to_pdf(source_path: str) -> tuple[str, str]:
-    output_dir = mkdtemp()
-    commands = ("libreoffice", "soffice")
-    stdout_data = stderr_data = ""
+def _start_unoserver() -> subprocess.Popen[bytes] | None:
+    if shutil.which("unoserver") is None:
+        return None
+    # A session of its own lets _stop_unoserver signal unoserver and its
+    # soffice child together.
+    return subprocess.Popen(
+        ["unoserver"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
 
-    for executable in commands:
+def _stop_unoserver(unoserver: subprocess.Popen[bytes], grace: float = 0) -> None:
+    if grace:
         try:
-            result = subprocess.run(
-                [
-                    executable,
-                    "--headless",
-                    "--convert-to",
-                    "pdf",
-                    "--outdir",
-                    output_dir,
-                    source_path,
-                ],
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-        except FileNotFoundError:
-            continue
-        except subprocess.CalledProcessError as exc:
-            stderr_data = exc.stderr.decode("utf-8", errors="ignore")
-            stdout_data = exc.stdout.decode("utf-8", errors="ignore")
-            shutil.rmtree(output_dir, ignore_errors=True)
-            detail = stderr_data.strip() or stdout_data.strip() or "Unknown conversion error"
-            raise HTTPException(status_code=500, detail=f"Failed to convert document to PDF: {detail}") from exc
-        else:
-            stdout_data = result.stdout.decode("utf-8", errors="ignore")
-            stderr_data = result.stderr.decode("utf-8", errors="ignore")
-            break
-    else:  # pragma: no cover - defensive branch
-        shutil.rmtree(output_dir, ignore_errors=True)
+            os.killpg(unoserver.pid, signal.SIGTERM)
+            unoserver.wait(timeout=grace)
+        except (ProcessLookupError, subprocess.TimeoutExpired):
+            pass
+    # Whatever is left of the group, soffice included, goes down regardless.
+    try:
+        os.killpg(unoserver.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    unoserver.wait()
+
+
+def _get_unoserver(app: FastAPI) -> subprocess.Popen[bytes] | None:
+    unoserver = app.state.unoserver
+    if unoserver is not None and unoserver.poll() is not None:
+        # Killed after a hang, or crashed; bring LibreOffice back for this and
+        # later requests instead of leaving them on the slow fallback.
+        unoserver = app.state.unoserver = _start_unoserver()
+    return unoserver
+
+
+def _convert_with_libreoffice(
+    source_path: str, output_dir: str, private_profile: bool = False
+) -> subprocess.CompletedProcess[bytes]:
+    executable = shutil.which("libreoffice") or shutil.which("soffice")
+    if executable is None:
         raise HTTPException(
             status_code=500,
-            detail="LibreOffice (libreoffice or soffice) is required for document conversion",
+            detail="LibreOffice (unoserver, libreoffice or soffice) is required for document conversion",
         )
+    command = [executable]
+    profile_dir = None
+    if private_profile:
+        # With unoserver around, a private profile keeps this process from
+        # handing the job to unoserver's soffice, which would exit without
+        # writing the PDF. Without it, the default profile avoids paying
+        # LibreOffice's first-run setup on every document.
+        profile_dir = mkdtemp()
+        command.append(f"-env:UserInstallation=file://{profile_dir}")
+    command += ["--headless", "--convert-to", "pdf", "--outdir", output_dir, source_path]
+    try:
+        return subprocess.run(
+            command,
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=OFFICE_CONVERT_TIMEOUT,
+        )
+    finally:
+        if profile_dir is not None:
+            shutil.rmtree(profile_dir, ignore_errors=True)
 
+
+def _convert_office_to_pdf(
+    source_path: str, unoserver: subprocess.Popen[bytes] | None = None
+) -> tuple[str, str]:
+    output_dir = mkdtemp()
     base_name = os.path.splitext(os.path.basename(source_path))[0] + ".pdf"
     pdf_path = os.path.join(output_dir, base_name)
 
+    try:
+        if unoserver is None:
+            result = _convert_with_libreoffice(source_path, output_dir)
+        elif unoserver.poll() is not None:
+            result = _convert_with_libreoffice(source_path, output_dir, private_profile=True)
+        else:
+            try:
+                result = subprocess.run(
+                    ["unoconvert", "--convert-to", "pdf", source_path, pdf_path],
+                    check=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    timeout=OFFICE_CONVERT_TIMEOUT,
+                )
+            except FileNotFoundError:
+                result = _convert_with_libreoffice(source_path, output_dir, private_profile=True)
+            except subprocess.TimeoutExpired:
+                # The resident soffice hung; kill it with its wrapper so the
+                # next request starts a fresh unoserver (see _get_unoserver).
+                _stop_unoserver(unoserver)
+                result = _convert_with_libreoffice(source_path, output_dir, private_profile=True)
+            except subprocess.CalledProcessError:
+                # Only a dead server warrants the slow fallback; a document
+                # that unoserver rejects would fail there too.
+                if unoserver.poll() is None:
+                    raise
+                result = _convert_with_libreoffice(source_path, output_dir, private_profile=True)
+    except subprocess.CalledProcessError as exc:
+        stderr_data = exc.stderr.decode("utf-8", errors="ignore")
+        stdout_data = exc.stdout.decode("utf-8", errors="ignore")
+        shutil.rmtree(output_dir, ignore_errors=True)
+        detail = stderr_data.strip() or stdout_data.strip() or "Unknown conversion error"
+        raise HTTPException(status_code=500, detail=f"Failed to convert document to PDF: {detail}") from exc
+    except subprocess.TimeoutExpired as exc:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        raise HTTPException(status_code=500, detail="Document conversion timed out") from exc
+    except HTTPException:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        raise
+
+    stdout_data = result.stdout.decode("utf-8", errors="ignore")
+    stderr_data = result.stderr.decode("utf-8", errors="ignore")
+
     if not os.path.exists(pdf_path):
         detail = stderr_data.strip() or stdout_data.strip() or "PDF file was not created"
         shutil.rmtree(output_dir, ignore_errors=True)
@@ -128,149 +309,294 @@ def _convert_office_to_pdf(source_path: str) -> tuple[str, str]:
 
 def _extract_video_frame(
     video_path: str,
-    output_dir: str,
     width: int | None = None,
     height: int | None = None,
     quality: int | None = None,
-) -> list[str]:
-    output_path = os.path.join(output_dir, "frame-1.jpg")
-
-    command = [
-        "ffmpeg",
-        "-y",
-        "-i",
-        video_path,
-        "-frames:v",
-        "1",
-    ]
-
-    if width is not None or height is not None:
-        if width and height:
-            scale_value = f"scale={width}:{height}"
-        elif width:
-            scale_value = f"scale={width}:-1"
-        else:
-            scale_value = f"scale=-1:{height}"
-        command.extend(["-vf", scale_value])
-
-    if quality is not None:
-        mapped_quality = max(1, min(31, int(round(31 - (quality / 100) * 30))))
-        command.extend(["-q:v", str(mapped_quality)])
-    else:
-        command.extend(["-q:v", "2"])
+) -> bytes:
+    try:
+        with av.open(video_path) as container:
+            stream = container.streams.video[0]
+            # Only keyframes are needed, so skip decoding everything in between.
+            stream.codec_context.skip_frame = "NONKEY"
+            frame = next(container.decode(stream))
+            # to_image() ignores the display matrix that the ffmpeg CLI used to
+            # apply, so portrait phone videos would come out sideways. Size the
+            # frame in its stored orientation and rotate afterwards.
+            transpose = VIDEO_ROTATION_TRANSPOSE.get(frame.rotation % 360)
+            quarter_turn = frame.rotation % 180 != 0
+            display_width, display_height = (
+                (frame.height, frame.width) if quarter_turn else (frame.width, frame.height)
+            )
+            if width and not height:
+                height = max(1, round(display_height * width / display_width))
+            elif height and not width:
+                width = max(1, round(display_width * height / display_height))
+            if quarter_turn:
+                width, height = height, width
+            image = frame.to_image(width=width, height=height)
+            if transpose is not None:
+                image = image.transpose(transpose)
+    except IndexError as exc:
+        raise HTTPException(status_code=500, detail="Video file does not contain a video stream") from exc
+    except StopIteration as exc:
+        raise HTTPException(status_code=500, detail="Video frame extraction did not produce an image") from exc
+    except av.error.FFmpegError as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to extract video frame: {exc}") from exc
+
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        format="JPEG",
+        quality=quality if quality is not None else DEFAULT_VIDEO_FRAME_QUALITY,
+    )
+    return buffer.getvalue()
+
+
+def _page_matrix(page: pymupdf.Page, width: int | None, height: int | None) -> pymupdf.Matrix:
+    if width is None and height is None:
+        zoom = DEFAULT_RENDER_DPI / 72
+        return pymupdf.Matrix(zoom, zoom)
+    x_scale = width / page.rect.width if width else None
+    y_scale = height / page.rect.height if height else None
+    return pymupdf.Matrix(x_scale or y_scale, y_scale or x_scale)
+
+
+def _render_page(
+    pdf_path: str,
+    page_index: int,
+    width: int | None = None,
+    height: int | None = None,
+    quality: int | None = None,
+) -> bytes:
+    jpeg_quality = quality if quality is not None else DEFAULT_JPEG_QUALITY
+    with pymupdf.open(pdf_path) as document:
+        page = document.load_page(page_index)
+        pixmap = page.get_pixmap(matrix=_page_matrix(page, width, height), alpha=False)
+        # Encode through Pillow: its wheels ship libjpeg-turbo, whereas MuPDF's
+        # bundled libjpeg has no SIMD paths.
+        return pixmap.pil_tobytes(format="JPEG", quality=jpeg_quality)
 
-    command.append(output_path)
 
-    try:
-        subprocess.run(
-            command,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-    except FileNotFoundError as exc:  # pragma: no cover - external dependency
-        raise HTTPException(status_code=500, detail="FFmpeg is required for video conversion") from exc
-    except subprocess.CalledProcessError as exc:
-        detail = exc.stderr.decode("utf-8", errors="ignore").strip()
-        if not detail:
-            detail = exc.stdout.decode("utf-8", errors="ignore").strip()
-        raise HTTPException(status_code=500, detail=f"Failed to extract video frame: {detail}") from exc
+def _warm_renderer() -> None:
+    with pymupdf.open() as document:
+        page = document.new_page()
+        page.get_pixmap(alpha=False).pil_tobytes(format="JPEG")
 
-    if not os.path.exists(output_path):
-        raise HTTPException(status_code=500, detail="Video frame extraction did not produce an image")
 
-    return [output_path]
+def _warm_up() -> None:
+    # Load MuPDF and the JPEG encoder here and in the pool workers, and let
+    # pybase64 resolve its SIMD codec, before the first real request.
+    _warm_renderer()
+    futures = [_POOL.submit(_warm_renderer) for _ in range(os.cpu_count() or 1)]
+    for future in futures:
+        future.result()
+    pybase64.b64encode(b"\0" * 3)
 
 
-def _convert_pdf_to_jpeg_paths(
+async def _render_pdf_pages(
     pdf_path: str,
-    output_dir: str,
     width: int | None = None,
     height: int | None = None,
     quality: int | None = None,
-) -> list[str]:
-    kwargs: dict[str, object] = {}
-    if width is not None or height is not None:
-        kwargs["size"] = (width or 0, height or 0)
-    if quality is not None:
-        kwargs["jpegopt"] = {"quality": quality}
+) -> AsyncIterator[bytes]:
+    global _POOL
+    pool = _POOL
+    loop = asyncio.get_running_loop()
     try:
-        return convert_from_path(
-            pdf_path,
-            fmt="jpeg",
-            output_folder=output_dir,
-            output_file="page",
-            paths_only=True,
-            **kwargs,
-        )
+        with pymupdf.open(pdf_path) as document:
+            page_count = document.page_count
+        render = partial(_render_page, pdf_path, width=width, height=height, quality=quality)
+        # Await the workers instead of blocking on them so the event loop keeps
+        # serving other requests while this document renders.
+        futures = [loop.run_in_executor(pool, render, index) for index in range(page_count)]
+        try:
+            for future in futures:
+                yield await future
+        finally:
+            for future in futures:
+                future.cancel()
+    except BrokenProcessPool as exc:
+        # A crashed worker poisons the whole pool; replace it for later
+        # requests, unless a concurrent request already has.
+        if _POOL is pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+            _POOL = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=_POOL_CONTEXT)
+        raise HTTPException(status_code=500, detail=f"Failed to convert PDF: {exc}") from exc
     except Exception as exc:  # pragma: no cover - defensive logging
         raise HTTPException(status_code=500, detail=f"Failed to convert PDF: {exc}") from exc
 
 
-def _multipart_stream(image_paths: Iterable[str], boundary: str) -> Iterable[bytes]:
-    for index, image_path in enumerate(image_paths, start=1):
-        filename = f"page-{index}.jpg"
-        content_length = os.path.getsize(image_path)
-        headers = (
-            f"--{boundary}\r\n"
-            "Content-Type: image/jpeg\r\n"
-            f"Content-Disposition: attachment; filename=\"{filename}\"\r\n"
-            f"Content-Length: {content_length}\r\n\r\n"
-        )
-        yield headers.encode("latin-1")
-        with open(image_path, "rb") as image_file:
-            while True:
-                chunk = image_file.read(CHUNK_SIZE)
-                if not chunk:
-                    break
-                yield chunk
-        yield b"\r\n"
-    yield f"--{boundary}--\r\n".encode("latin-1")
-
-
-def _stream_file(path: str) -> Iterable[bytes]:
-    with open(path, "rb") as file_obj:
-        while True:
-            chunk = file_obj.read(CHUNK_SIZE)
-            if not chunk:
-                break
-            yield chunk
-
+class _SpooledPages:
+    # Encoded JPEG pages in order. Pages stay in memory until PAGE_SPILL_SIZE
+    # bytes are held; later pages are written to spill_dir and read back one
+    # at a time while the response is streamed.
+
+    def __init__(self, spill_dir: str) -> None:
+        self._spill_dir = spill_dir
+        self._pages: list[bytes | str] = []
+        self._in_memory = 0
+
+    def append(self, image_bytes: bytes) -> None:
+        if self._in_memory + len(image_bytes) <= PAGE_SPILL_SIZE:
+            self._in_memory += len(image_bytes)
+            self._pages.append(image_bytes)
+            return
+        spill_path = os.path.join(self._spill_dir, f"page-{len(self._pages) + 1}.jpg")
+        with open(spill_path, "wb") as spill_file:
+            spill_file.write(image_bytes)
+        self._pages.append(spill_path)
+
+    def __iter__(self) -> Iterator[bytes]:
+        for page in self._pages:
+            if isinstance(page, str):
+                with open(page, "rb") as spill_file:
+                    yield spill_file.read()
+            else:
+                yield page
 
-def _create_zip_archive(image_paths: Iterable[str]) -> str:
-    with NamedTemporaryFile(delete=False, suffix=".zip") as tmp_zip:
-        zip_path = tmp_zip.name
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for page in self._pages:
+            if isinstance(page, str):
+                async with aiofiles.open(page, "rb") as spill_file:
+                    yield await spill_file.read()
+            else:
+                yield page
 
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
-        for index, image_path in enumerate(image_paths, start=1):
-            arcname = f"page-{index}.jpg"
-            zip_file.write(image_path, arcname=arcname)
 
-    return zip_path
+async def _multipart_stream(images: AsyncIterable[bytes], boundary: str) -> AsyncIterator[bytes]:
+    boundary_bytes = boundary.encode("latin-1")
+    index = 0
+    async for image_bytes in images:
+        index += 1
+        yield MULTIPART_PART_HEADER % (boundary_bytes, index, len(image_bytes))
+        yield image_bytes
+        yield b"\r\n"
+    yield b"--%s--\r\n" % boundary_bytes
+
+
+async def _json_stream(images: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    yield b"["
+    index = 0
+    async for image_bytes in images:
+        index += 1
+        if index > 1:
+            yield b","
+        yield (
+            f'{{"page":{index},"filename":"page-{index}.jpg",'
+            '"data":"data:image/jpeg;base64,'
+        ).encode("ascii")
+        view = memoryview(image_bytes)
+        for offset in range(0, len(view), JSON_CHUNK_SIZE):
+            yield pybase64.b64encode(view[offset : offset + JSON_CHUNK_SIZE])
+        yield b'"}'
+    yield b"]"
+
+
+async def _zip_stream(images: Iterable[bytes], deflate: bool = False) -> AsyncIterator[bytes]:
+    # JPEG data is already entropy-coded, so DEFLATE costs CPU for ~1% savings.
+    method = ZIP_64 if deflate else NO_COMPRESSION_64
+    modified_at = datetime.now()
+
+    def members() -> Iterator[MemberFile]:
+        mode = stat.S_IFREG | 0o644
+        for index, image_bytes in enumerate(images, start=1):
+            yield f"page-{index}.jpg", modified_at, mode, method, (image_bytes,)
+
+    chunks = stream_zip(
+        members(),
+        chunk_size=CHUNK_SIZE,
+        get_compressobj=lambda: zlib.compressobj(wbits=-zlib.MAX_WBITS),
+    )
+    if not deflate:
+        # Stored members only cost a CRC32 over bytes already in memory, which
+        # is cheaper than a thread hop per output chunk.
+        for chunk in chunks:
+            yield chunk
+        return
+    # DEFLATE is CPU-bound, so each output chunk is produced on a worker thread.
+    while True:
+        chunk = await run_in_threadpool(next, chunks, None)
+        if chunk is None:
+            break
+        yield chunk
 
 
-def _wants_zip(response_format: str | None, accept_header: str | None) -> bool:
-    if response_format and response_format.lower() == "zip":
-        return True
-    if not accept_header:
-        return False
-    for item in accept_header.split(","):
-        media_type = item.split(";")[0].strip().lower()
-        if media_type in {"application/zip", "application/x-zip-compressed"}:
-            return True
-    return False
+def _drop_jpeg_batch(directory: str) -> None:
+    _, _, page_ids = _JPEG_BATCHES.pop(directory)
+    for page_id in page_ids:
+        del _JPEG_STORE[page_id]
+    shutil.rmtree(directory, ignore_errors=True)
 
 
-def _wants_json(response_format: str | None, accept_header: str | None) -> bool:
-    if response_format:
-        return response_format.lower() == "json"
-    if not accept_header:
-        return False
-    for item in accept_header.split(","):
-        media_type = item.split(";")[0].strip().lower()
-        if media_type == "application/json":
-            return True
-    return False
+def _purge_expired_jpegs(incoming: int = 0) -> None:
+    # Drop expired batches, then the oldest live ones until `incoming` more
+    # bytes fit under the cap.
+    now = time.monotonic()
+    stored = sum(size for _, size, _ in _JPEG_BATCHES.values())
+    while _JPEG_BATCHES:
+        directory, (expires_at, size, _) = next(iter(_JPEG_BATCHES.items()))
+        if expires_at > now and stored + incoming <= JPEG_STORE_MAX_BYTES:
+            break
+        _drop_jpeg_batch(directory)
+        stored -= size
+
+
+def _clear_jpeg_store() -> None:
+    while _JPEG_BATCHES:
+        _drop_jpeg_batch(next(iter(_JPEG_BATCHES)))
+
+
+def _write_jpegs(images: Iterable[bytes]) -> tuple[str, list[str], int]:
+    store_dir = mkdtemp()
+    stored_paths: list[str] = []
+    size = 0
+    for index, image_bytes in enumerate(images, start=1):
+        stored_path = os.path.join(store_dir, f"page-{index}.jpg")
+        with open(stored_path, "wb") as stored_file:
+            stored_file.write(image_bytes)
+        stored_paths.append(stored_path)
+        size += len(image_bytes)
+    return store_dir, stored_paths, size
+
+
+def _publish_jpegs(store_dir: str, stored_paths: list[str], size: int) -> list[dict[str, object]]:
+    # Runs on the event loop only: the purge and the inserts into the store
+    # are not safe to interleave across threads.
+    _purge_expired_jpegs(size)
+    page_ids: list[str] = []
+    pages: list[dict[str, object]] = []
+    for index, stored_path in enumerate(stored_paths, start=1):
+        page_id = uuid.uuid4().hex
+        _JPEG_STORE[page_id] = stored_path
+        page_ids.append(page_id)
+        pages.append({"page": index, "filename": f"page-{index}.jpg", "url": f"/jpeg/{page_id}"})
+    _JPEG_BATCHES[store_dir] = (time.monotonic() + JPEG_URL_TTL, size, page_ids)
+    return pages
+
+
+def _negotiate(
+    response_format: str | None, accept_header: str | None
+) -> Literal["zip", "zip-deflate", "urls", "json", "multipart"]:
+    requested = (response_format or "").lower()
+    if requested in ZIP_RESPONSE_FORMATS:
+        return "zip-deflate" if requested == "zip-deflate" else "zip"
+
+    # A single pass over the Accept header; ZIP wins over JSON wherever it
+    # appears, so stop as soon as it is seen.
+    accepts_json = False
+    if accept_header:
+        for item in accept_header.split(","):
+            accepted = ACCEPT_RESPONSE_FORMATS.get(item.partition(";")[0].strip().lower())
+            if accepted == "zip":
+                return "zip"
+            if accepted == "json":
+                accepts_json = True
+
+    if requested == "urls":
+        return "urls"
+    if requested:
+        return "json" if requested == "json" else "multipart"
+    return "json" if accepts_json else "multipart"
 
 
 def _require_http_url(value: str | None) -> str:
@@ -281,20 +607,49 @@ def _require_http_url(value: str | None) -> str:
     return value
 
 
-async def _capture_url_screenshot(url: str) -> bytes:
+async def _get_browser(app: FastAPI) -> Browser:
+    browser = app.state.browser
+    if browser is not None and browser.is_connected():
+        return browser
+    async with app.state.browser_lock:
+        browser = app.state.browser
+        if browser is None or not browser.is_connected():
+            try:
+                browser = await app.state.playwright.chromium.launch(
+                    headless=True, args=["--no-sandbox"]
+                )
+            except PlaywrightError as exc:
+                raise HTTPException(status_code=503, detail=f"Browser is unavailable: {exc}") from exc
+            app.state.browser = browser
+    return browser
+
+
+async def _skip_heavy_resources(route: Route) -> None:
+    # Match on resource type rather than URL: image URLs often carry query
+    # strings or have no extension at all.
+    if route.request.resource_type in FAST_BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _capture_url_screenshot(browser: Browser, url: str, fast: bool = False) -> bytes:
     try:
-        async with async_playwright() as playwright:
-            browser = await playwright.chromium.launch(headless=True, args=["--no-sandbox"])
+        context = await browser.new_context(viewport={"width": 1920, "height": 1080})
+        try:
+            if fast:
+                await context.route("**/*", _skip_heavy_resources)
+            page = await context.new_page()
+            await page.goto(url, wait_until="load", timeout=15000)
+            # Give late requests a brief chance to settle, but never wait on
+            # analytics beacons and long-polling for the full timeout.
             try:
-                context = await browser.new_context(viewport={"width": 1920, "height": 1080})
-                try:
-                    page = await context.new_page()
-                    await page.goto(url, wait_until="networkidle", timeout=30000)
-                    return await page.screenshot(type="jpeg", quality=90)
-                finally:
-                    await context.close()
-            finally:
-                await browser.close()
+                await page.wait_for_load_state("networkidle", timeout=1500)
+            except PlaywrightTimeoutError:
+                pass
+            return await page.screenshot(type="jpeg", quality=90)
+        finally:
+            await context.close()
     except (PlaywrightTimeoutError, PlaywrightError) as exc:
         raise HTTPException(status_code=400, detail=f"Failed to capture screenshot: {exc}") from exc
     except HTTPException:
@@ -303,19 +658,44 @@ async def _capture_url_screenshot(url: str) -> bytes:
         raise HTTPException(status_code=500, detail=f"Unexpected screenshot error: {exc}") from exc
 
 
-async def _write_upload_to_tempfile(upload: UploadFile, suffix: str) -> str:
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, parts.fragment)
+    )
+
+
+async def _get_url_screenshot(app: FastAPI, url: str, fast: bool = False) -> bytes:
+    key = (_normalize_url(url), fast)
+    image_bytes = _SCREENSHOT_CACHE.get(key)
+    if image_bytes is not None:
+        return image_bytes
+
+    lock = _SCREENSHOT_LOCKS.setdefault(key, asyncio.Lock())
+    async with lock:
+        image_bytes = _SCREENSHOT_CACHE.get(key)
+        if image_bytes is None:
+            browser = await _get_browser(app)
+            image_bytes = await _capture_url_screenshot(browser, url, fast=fast)
+            _SCREENSHOT_CACHE[key] = image_bytes
+    return image_bytes
+
+
+async def _write_upload_to_tempfile(upload: UploadFile, suffix: str) -> tuple[str, int]:
     suffix = suffix if suffix.startswith(".") else f".{suffix}" if suffix else ""
     with NamedTemporaryFile(delete=False, suffix=suffix or "") as tmp_file:
-        while True:
-            chunk = await upload.read(CHUNK_SIZE)
-            if not chunk:
-                break
-            tmp_file.write(chunk)
-        return tmp_file.name
+        # Copy from the underlying spooled file in one worker-thread hop rather
+        # than awaiting UploadFile.read() once per chunk.
+        await run_in_threadpool(shutil.copyfileobj, upload.file, tmp_file, CHUNK_SIZE * 4)
+        return tmp_file.name, tmp_file.tell()
 
 
 @app.post("/screenshot")
-async def screenshot(request: Request, url: str | None = Query(default=None)) -> StreamingResponse:
+async def screenshot(
+    request: Request,
+    url: str | None = Query(default=None),
+    fast: bool = Query(default=False),
+) -> StreamingResponse:
     body_url: str | None = None
 
     if url is None:
@@ -327,12 +707,13 @@ async def screenshot(request: Request, url: str | None = Query(default=None)) ->
                 raise HTTPException(status_code=400, detail="Invalid JSON body") from exc
             if isinstance(payload, dict):
                 body_url = payload.get("url")
+                fast = fast or bool(payload.get("fast"))
     target_url = _require_http_url(url or body_url)
 
-    image_bytes = await _capture_url_screenshot(target_url)
+    image_bytes = await _get_url_screenshot(request.app, target_url, fast=fast)
     buffer = BytesIO(image_bytes)
 
-    def content() -> Iterable[bytes]:
+    async def content() -> AsyncIterator[bytes]:
         try:
             buffer.seek(0)
             while True:
@@ -355,7 +736,7 @@ async def convert_pdf(
     image_height: int | None = Query(default=None, ge=1, le=10000),
     image_quality: int | None = Query(default=None, ge=1, le=100),
     file: UploadFile = File(...),
-) -> StreamingResponse:
+) -> Response:
     suffix = _get_upload_suffix(file)
     if suffix not in SUPPORTED_EXTENSIONS:
         raise HTTPException(
@@ -365,18 +746,19 @@ async def convert_pdf(
             ),
         )
 
-    tmp_path = await _write_upload_to_tempfile(file, suffix)
+    tmp_path, upload_size = await _write_upload_to_tempfile(file, suffix)
     await file.close()
 
-    if os.path.getsize(tmp_path) == 0:
+    if upload_size == 0:
         os.unlink(tmp_path)
         raise HTTPException(status_code=400, detail="Uploaded file is empty")
 
     temp_images = TemporaryDirectory()
     boundary = f"{BOUNDARY_PREFIX}-{uuid.uuid4().hex}"
-    accept_header = request.headers.get("accept")
-    wants_zip = _wants_zip(response_format, accept_header)
-    wants_json = False if wants_zip else _wants_json(response_format, accept_header)
+    negotiated = _negotiate(response_format, request.headers.get("accept"))
+    wants_zip = negotiated in ZIP_RESPONSE_FORMATS
+    wants_urls = negotiated == "urls"
+    wants_json = negotiated == "json"
 
     cleanup_dirs: list[str] = []
 
@@ -392,75 +774,96 @@ async def convert_pdf(
             shutil.rmtree(directory, ignore_errors=True)
         temp_images.cleanup()
 
-    zip_path: str | None = None
-
     category = _categorize_extension(suffix)
 
     if category == "unknown":
         cleanup(None)
         raise HTTPException(status_code=400, detail="Unsupported file extension")
 
-    if category == "video":
-        try:
-            image_paths = _extract_video_frame(
-                tmp_path,
-                temp_images.name,
-                width=image_width,
-                height=image_height,
-                quality=image_quality,
+    pages = _SpooledPages(temp_images.name)
+
+    try:
+        if category == "video":
+            pages.append(
+                await run_in_threadpool(
+                    _extract_video_frame,
+                    tmp_path,
+                    width=image_width,
+                    height=image_height,
+                    quality=image_quality,
+                )
             )
-        except Exception:
-            cleanup(None)
-            raise
-    else:
-        try:
+        else:
             pdf_path = tmp_path
             if category == "office":
-                pdf_path, output_dir = _convert_office_to_pdf(tmp_path)
+                pdf_path, output_dir = await run_in_threadpool(
+                    _convert_office_to_pdf, tmp_path, _get_unoserver(request.app)
+                )
                 cleanup_dirs.append(output_dir)
-            image_paths = _convert_pdf_to_jpeg_paths(
+            async for image_bytes in _render_pdf_pages(
                 pdf_path,
-                temp_images.name,
                 width=image_width,
                 height=image_height,
                 quality=image_quality,
-            )
-        except Exception:
-            cleanup(None)
-            raise
+            ):
+                pages.append(image_bytes)
+    except Exception:
+        cleanup(None)
+        raise
 
-    if wants_json:
+    if wants_urls:
         try:
-            json_payload = []
-            for index, image_path in enumerate(image_paths, start=1):
-                with open(image_path, "rb") as image_file:
-                    encoded = base64.b64encode(image_file.read()).decode("ascii")
-                encoded_uri = f"data:image/jpeg;base64,{encoded}"
-                json_payload.append(
-                    {
-                        "page": index,
-                        "filename": f"page-{index}.jpg",
-                        "data": encoded_uri,
-                    }
-                )
-            return JSONResponse(content=json_payload, media_type="application/json")
+            store_dir, stored_paths, size = await run_in_threadpool(_write_jpegs, pages)
         finally:
             cleanup(None)
+        return JSONResponse(content=_publish_jpegs(store_dir, stored_paths, size))
 
-    def content() -> Iterable[bytes]:
-        nonlocal zip_path
+    async def content() -> AsyncIterator[bytes]:
+        if wants_zip:
+            chunks = _zip_stream(pages, deflate=negotiated == "zip-deflate")
+        elif wants_json:
+            chunks = _json_stream(pages)
+        else:
+            chunks = _multipart_stream(pages, boundary)
         try:
-            if wants_zip:
-                zip_path = _create_zip_archive(image_paths)
-                yield from _stream_file(zip_path)
-            else:
-                yield from _multipart_stream(image_paths, boundary)
+            async for chunk in chunks:
+                yield chunk
         finally:
-            cleanup(zip_path)
+            cleanup(None)
 
-    media_type = "application/zip" if wants_zip else f"multipart/mixed; boundary={boundary}"
-    headers = {"Content-Disposition": f'attachment; filename="{ZIP_FILENAME}"'} if wants_zip else None
-    return StreamingResponse(content(), media_type=media_type, headers=headers)
+    headers = None
+    if wants_zip:
+        media_type = "application/zip"
+        headers = {"Content-Disposition": f'attachment; filename="{ZIP_FILENAME}"'}
+    elif wants_json:
+        media_type = "application/json"
+    else:
+        media_type = f"multipart/mixed; boundary={boundary}"
+    # content() is never resumed after a client disconnect, so its finally
+    # block cannot be relied on; the background task always runs once the
+    # response has finished or been abandoned.
+    return StreamingResponse(
+        content(),
+        media_type=media_type,
+        headers=headers,
+        background=BackgroundTask(cleanup),
+    )
+
+
+@app.get("/jpeg/{page_id}")
+async def get_jpeg(page_id: str) -> Response:
+    _purge_expired_jpegs()
+    stored_path = _JPEG_STORE.get(page_id)
+    if stored_path is None:
+        raise HTTPException(status_code=404, detail="Image not found or expired")
+    # Read the page here rather than handing FileResponse a path: another
+    # request may evict and delete the batch while its stat is in flight.
+    try:
+        async with aiofiles.open(stored_path, "rb") as stored_file:
+            image_bytes = await stored_file.read()
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Image not found or expired") from exc
+    return Response(content=image_bytes, media_type="image/jpeg")
 
 
 @app.get("/healthz")